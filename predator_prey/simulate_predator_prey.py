@@ -13,13 +13,16 @@ partial differential equations that model birth, death, and diffusion processes.
 Author: s2659865
 Date: April 2025
 """
-from argparse import ArgumentParser
+import os
 import numpy as np
 import random
 import time
+from functools import lru_cache
 from typing import Tuple
 
-from predator_prey.utils.validation import validate_simulation_parameters, validate_file_exists
+from predator_prey.utils.validation import (
+    SUPPORTED_PRECISIONS, validate_simulation_parameters, validate_precision, validate_file_exists
+)
 from predator_prey.src.landscape import generate_landscape, smooth_landscape, calculate_neighbors, create_land_mask
 from predator_prey.src.population import initialize_populations
 from predator_prey.src.io_handlers import load_animal_file
@@ -36,8 +39,11 @@ def simCommLineIntf():
     Command-line interface for the predator-prey simulation.
     
     This function parses command-line arguments and calls the main simulation
-    function with the parsed parameters.
+    function with the parsed parameters. Programmatic callers should call
+    sim() directly; argparse is only imported when this entry point runs.
     """
+    from argparse import ArgumentParser
+
     par = ArgumentParser()
     par.add_argument("-r", "--birth-mice", type=float, default=0.1, help="Birth rate of mice")
     par.add_argument("-a", "--death-mice", type=float, default=0.05, help="Rate at which foxes eat mice")
@@ -53,15 +59,77 @@ def simCommLineIntf():
     par.add_argument("-lsm", "--landscape-smooth", type=int, default=2, help="Number of smoothing passes after landscape initialisation")
     par.add_argument("-f", "--landscape-file", type=str, required=True,
                     help="Input landscape file")
+    par.add_argument("-bp", "--binary-ppm", action="store_true",
+                    help="Write binary (P6) PPM files instead of ASCII (P3) ones")
+    par.add_argument("-p", "--precision", choices=SUPPORTED_PRECISIONS, default="f64",
+                    help="Floating-point precision of the population arrays")
+    par.add_argument("-ss", "--synchronous-smoothing", action="store_true",
+                    help="Smooth the landscape with vectorized synchronous passes (not identical to the reference)")
     args = par.parse_args()
     
     sim(args.birth_mice, args.death_mice, args.diffusion_mice, 
         args.birth_foxes, args.death_foxes, args.diffusion_foxes,
         args.delta_t, args.time_step, args.duration, args.landscape_file,
-        args.landscape_seed, args.landscape_prop, args.landscape_smooth)
+        args.landscape_seed, args.landscape_prop, args.landscape_smooth,
+        binary_ppm=args.binary_ppm, precision=args.precision,
+        synchronous_smoothing=args.synchronous_smoothing)
+
+
+@lru_cache(maxsize=1)
+def prepare_landscape(
+    lfile: str, mtime_ns: int, size: int, lseed: int, lp: float, lsm: int,
+    synchronous_smoothing: bool = False
+) -> Tuple[int, int, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Load the animal file and build the landscape-derived arrays for a run.
+    
+    Results are memoized on the file's identity (absolute path, modification
+    time and size) and the landscape parameters, so sweeps that only vary the
+    rates reuse the same initial state. Only the most recent result is kept,
+    so a sweep over different grids never holds more than one set of arrays
+    alive between runs. The returned arrays are shared between calls and are
+    therefore marked read-only.
+    
+    Args:
+        lfile: Absolute path to the animal file
+        mtime_ns: Modification time of the file in nanoseconds
+        size: Size of the file in bytes
+        lseed: Random seed for landscape generation
+        lp: Proportion of landscape that is land
+        lsm: Number of smoothing passes
+        synchronous_smoothing: Smooth with synchronous passes instead of the
+            reference's sequential ones
+        
+    Returns:
+        Tuple of (width, height, mice, foxes, landscape, neighbors, land_mask)
+    """
+    # Load animal file
+    width, height, mice, foxes = load_animal_file(lfile)
+    
+    # Generate landscape
+    landscape = generate_landscape(width, height, lseed, lp)
+    
+    # Apply smoothing
+    landscape = smooth_landscape(landscape, lsm, synchronous=synchronous_smoothing)
+    
+    # Initialize populations
+    mice, foxes = initialize_populations(mice, foxes, landscape)
+    
+    # Calculate land neighbors
+    neighbors = calculate_neighbors(landscape)
+    
+    # Create land mask
+    land_mask = create_land_mask(landscape)
+    
+    # Guard the cached arrays against accidental in-place modification
+    for array in (mice, foxes, landscape, neighbors, land_mask):
+        array.setflags(write=False)
+    
+    return width, height, mice, foxes, landscape, neighbors, land_mask
 
 
-def sim(r, a, k, b, m, l, dt, t, d, lfile, lseed, lp, lsm):
+def sim(r, a, k, b, m, l, dt, t, d, lfile, lseed, lp, lsm, binary_ppm=False, precision="f64",
+        synchronous_smoothing=False):
     """
     Run the predator-prey simulation with the given parameters.
     
@@ -79,44 +147,40 @@ def sim(r, a, k, b, m, l, dt, t, d, lfile, lseed, lp, lsm):
         lseed: Random seed for landscape generation
         lp: Proportion of landscape that is land
         lsm: Number of smoothing passes
+        binary_ppm: Write binary (P6) PPM files instead of ASCII (P3) ones
+        precision: Population precision, "f64" (default, matches the reference
+            output exactly) or "f32" (faster, approximately equal results)
+        synchronous_smoothing: Smooth the landscape with vectorized
+            synchronous passes, which is faster on large grids but gives a
+            different landscape from the reference
     """
     print("Predator-prey simulation", getVersion())
     
     # Validate parameters
     try:
         validate_simulation_parameters(r, a, k, b, m, l, dt, t, d, lseed, lp, lsm)
-        validate_file_exists(lfile)
+        validate_precision(precision)
+        lfile_stat = validate_file_exists(lfile)
     except (ValueError, FileNotFoundError, PermissionError) as e:
         print(f"Error: {str(e)}")
         return
     
     try:
-        # Load animal file
-        width, height, mice, foxes = load_animal_file(lfile)
+        # Load the animal file and build the landscape (cached across runs)
+        width, height, mice, foxes, landscape, neighbors, land_mask = prepare_landscape(
+            os.path.abspath(lfile), lfile_stat.st_mtime_ns, lfile_stat.st_size, lseed, lp, lsm,
+            synchronous_smoothing
+        )
         print(f"Width: {width} Height: {height}")
         
-        # Generate landscape
-        landscape = generate_landscape(width, height, lseed, lp)
-        
-        # Apply smoothing
-        landscape = smooth_landscape(landscape, lsm)
-        
-        # Initialize populations
-        mice, foxes = initialize_populations(mice, foxes, landscape)
-        
-        # Calculate land neighbors
-        neighbors = calculate_neighbors(landscape)
-        
-        # Create land mask
-        land_mask = create_land_mask(landscape)
-        
         # Count land cells
         land_count = np.count_nonzero(land_mask)
         print(f"Number of land-only squares: {land_count}")
         
         # Run the simulation
         run_simulation(r, a, k, b, m, l, dt, t, d, width, height, mice, foxes, 
-                      landscape, neighbors, land_mask)
+                      landscape, neighbors, land_mask, binary_ppm=binary_ppm,
+                      precision=precision)
                       
     except Exception as e:
         print(f"Error during simulation: {str(e)}")
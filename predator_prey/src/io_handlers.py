@@ -11,8 +11,10 @@ Author: s2659865
 Date: April 2025
 """
 import os
+import warnings
 import numpy as np
-from typing import Tuple, List
+from functools import lru_cache
+from typing import Tuple, List, TextIO
 
 from predator_prey.utils.validation import validate_file_exists
 
@@ -51,27 +53,27 @@ def load_animal_file(file_path: str) -> Tuple[int, int, np.ndarray, np.ndarray]:
             ms = np.zeros((hh, wh), dtype=np.float64)
             fs = np.zeros((hh, wh), dtype=np.float64)
             
-            # Parse animal density values
-            row = 1
-            for line in f.readlines():
-                if line.strip():  # Skip blank lines
-                    try:
-                        values = [int(i) for i in line.strip().split()]
-                        
-                        # Validate row length
-                        if len(values) != w:
-                            raise ValueError(f"Invalid row length in file: {len(values)}, expected {w}")
-                        
-                        # Read animals into array, padding with halo values
-                        ms[row] = [0] + [i // 10 for i in values] + [0]
-                        fs[row] = [0] + [i % 10 for i in values] + [0]
-                        row += 1
-                    except ValueError as e:
-                        raise ValueError(f"Error parsing line {row}: {str(e)}")
+            # Parse all animal density values in a single pass. 64-bit
+            # integers hold any density the reference accepted in practice;
+            # blank lines are skipped, and "#" gets no special meaning.
+            start = f.tell()
+            try:
+                with warnings.catch_warnings():
+                    # An empty grid is handled as a row count mismatch below
+                    warnings.simplefilter("ignore", UserWarning)
+                    values = np.loadtxt(f, dtype=np.int64, comments=None, ndmin=2)
+            except ValueError:
+                values = None
             
-            # Validate row count
-            if row - 1 != h:
-                raise ValueError(f"Invalid number of rows in file: {row-1}, expected {h}")
+            if values is not None and values.shape == (h, w):
+                # Read animals into the interior, leaving the halo at zero
+                ms[1:-1, 1:-1] = values // 10
+                fs[1:-1, 1:-1] = values % 10
+            else:
+                # Parse the grid again line by line, which either accepts
+                # values loadtxt does not or reports the reference's error
+                f.seek(start)
+                _parse_animal_rows(f, w, h, ms, fs)
             
             return w, h, ms, fs
                 
@@ -81,26 +83,104 @@ def load_animal_file(file_path: str) -> Tuple[int, int, np.ndarray, np.ndarray]:
         raise ValueError(f"Error reading animal file: {str(e)}")
 
 
-def initialize_averages_csv() -> None:
+def _parse_animal_rows(f: TextIO, w: int, h: int, ms: np.ndarray, fs: np.ndarray) -> None:
+    """
+    Parse animal density rows one line at a time.
+    
+    This is the reference parser. It is only used for grids that the
+    vectorized parser in load_animal_file rejects, so that invalid files
+    are reported with the reference's error messages.
+    
+    Args:
+        f: Open animal file, positioned after the dimensions line
+        w: Width of the landscape (excluding halo)
+        h: Height of the landscape (excluding halo)
+        ms: Mice density array to fill, including halo
+        fs: Foxes density array to fill, including halo
+        
+    Raises:
+        ValueError: If a row is malformed or the row count is wrong
+    """
+    row = 1
+    for line in f:
+        if line.strip():  # Skip blank lines
+            try:
+                values = [int(i) for i in line.strip().split()]
+                
+                # Validate row length
+                if len(values) != w:
+                    raise ValueError(f"Invalid row length in file: {len(values)}, expected {w}")
+                
+                # Read animals into array, padding with halo values
+                ms[row] = [0] + [i // 10 for i in values] + [0]
+                fs[row] = [0] + [i % 10 for i in values] + [0]
+                row += 1
+            except ValueError as e:
+                raise ValueError(f"Error parsing line {row}: {str(e)}")
+    
+    # Validate row count
+    if row - 1 != h:
+        raise ValueError(f"Invalid number of rows in file: {row-1}, expected {h}")
+
+
+def initialize_averages_csv(f: TextIO) -> None:
     """
     Initialize the averages CSV file with a header.
+    
+    Args:
+        f: Open text file handle for the averages CSV file
     """
-    with open("averages.csv", "w") as f:
-        f.write("Timestep,Time,Mice,Foxes\n")
+    f.write("Timestep,Time,Mice,Foxes\n")
+
 
+# printf-style row format for the averages CSV. %-formatting converts NumPy
+# scalars straight to C doubles, avoiding their slower __format__ method.
+AVERAGES_ROW_FORMAT = "%d,%.1f,%.*f,%.*f\n"
 
-def append_averages_csv(timestep: int, time: float, mice_avg: float, foxes_avg: float) -> None:
+
+def append_averages_csv(
+    f: TextIO, 
+    timestep: int, 
+    time: float, 
+    mice_avg: float, 
+    foxes_avg: float, 
+    digits: int = 17
+) -> None:
     """
     Append a record to the averages CSV file.
     
+    The handle is kept open by the caller for the whole run, so records are
+    collected by the file's write buffer instead of reopening the file at
+    every output step.
+    
     Args:
+        f: Open text file handle for the averages CSV file
         timestep: Current time step
         time: Current simulation time
         mice_avg: Average mice density
         foxes_avg: Average foxes density
+        digits: Number of decimal places written for the averages
     """
-    with open("averages.csv", "a") as f:
-        f.write(f"{timestep},{time:.1f},{mice_avg:.17f},{foxes_avg:.17f}\n")
+    f.write(AVERAGES_ROW_FORMAT % (timestep, time, digits, mice_avg, digits, foxes_avg))
+
+
+@lru_cache(maxsize=None)
+def ppm_pixel_table() -> np.ndarray:
+    """
+    Build the lookup table of P3 pixel lines used by generate_ppm.
+    
+    Land pixels are stored at index fox_colour * 256 + mouse_colour and the
+    water pixel is stored at the final index, WATER_PIXEL_INDEX.
+    
+    Returns:
+        Object array of pixel strings, each terminated by a newline
+    """
+    land_pixels = [f"{fcol} {mcol} 0\n" for fcol in range(256) for mcol in range(256)]
+    return np.array(land_pixels + ["0 200 255\n"], dtype=object)
+
+
+# Index of the water pixel in the PPM pixel table
+WATER_PIXEL_INDEX = 256 * 256
 
 
 def generate_ppm(
@@ -111,11 +191,17 @@ def generate_ppm(
     mice: np.ndarray, 
     foxes: np.ndarray, 
     mice_max: float, 
-    foxes_max: float
+    foxes_max: float,
+    binary: bool = False
 ) -> None:
     """
     Generate a PPM visualization of the current simulation state.
     
+    By default the image is written in the ASCII "P3" format, matching the
+    reference implementation byte for byte. With binary=True the same pixels
+    are written as a binary "P6" image in a single write, which is several
+    times smaller and much cheaper to produce on large grids.
+    
     Args:
         timestep: Current time step
         width: Width of the landscape (excluding halo)
@@ -125,27 +211,37 @@ def generate_ppm(
         foxes: Foxes density array
         mice_max: Maximum mice density (for scaling)
         foxes_max: Maximum foxes density (for scaling)
+        binary: Write a binary "P6" image instead of an ASCII "P3" one
     """
-    # Initialize color arrays
-    mcols = np.zeros((height, width), dtype=np.int32)
-    fcols = np.zeros((height, width), dtype=np.int32)
-    
-    # Calculate colors based on densities
-    for x in range(1, height + 1):
-        for y in range(1, width + 1):
-            if landscape[x, y]:
-                if mice_max != 0:
-                    mcol = int((mice[x, y] / mice_max) * 255)
-                else:
-                    mcol = 0
-                    
-                if foxes_max != 0:
-                    fcol = int((foxes[x, y] / foxes_max) * 255)
-                else:
-                    fcol = 0
-                    
-                mcols[x-1, y-1] = mcol
-                fcols[x-1, y-1] = fcol
+    # Interior (non-halo) views of the arrays
+    land = landscape[1:height + 1, 1:width + 1] != 0
+    
+    # Calculate colours based on densities. Water cells hold no animals, so
+    # they need no masking here and are replaced by the water colour below.
+    mice_scaled = _scale_densities(mice[1:height + 1, 1:width + 1], mice_max)
+    foxes_scaled = _scale_densities(foxes[1:height + 1, 1:width + 1], foxes_max)
+    _check_finite_colours(land, mice_scaled, foxes_scaled)
+    mcols = mice_scaled.astype(np.int32)
+    fcols = foxes_scaled.astype(np.int32)
+    
+    # The image data is assembled in full before the file is opened, so a
+    # failure above never leaves a partially written image behind
+    if binary:
+        # Assemble the RGB image directly, with water drawn in light blue
+        rgb = np.empty((height, width, 3), dtype=np.uint8)
+        rgb[..., 0] = fcols * land
+        rgb[..., 1] = np.where(land, mcols, 200)
+        rgb[..., 2] = np.where(land, 0, 255)
+        data = rgb.tobytes()
+        
+        with open(f"map_{timestep:04d}.ppm", "wb") as f:
+            f.write(f"P6\n{width} {height}\n255\n".encode("ascii"))
+            f.write(data)
+        return
+    
+    # Map every cell to its line in the pixel table
+    pixels = np.where(land, fcols * 256 + mcols, WATER_PIXEL_INDEX)
+    data = "".join(ppm_pixel_table()[pixels].ravel().tolist())
     
     # Write PPM file
     with open(f"map_{timestep:04d}.ppm", "w") as f:
@@ -153,9 +249,45 @@ def generate_ppm(
         f.write(f"P3\n{width} {height}\n255\n")
         
         # Write pixel data
-        for x in range(height):
-            for y in range(width):
-                if landscape[x+1, y+1]:
-                    f.write(f"{fcols[x, y]} {mcols[x, y]} 0\n")
-                else:
-                    f.write("0 200 255\n")
\ No newline at end of file
+        f.write(data)
+
+
+def _scale_densities(densities: np.ndarray, maximum: float) -> np.ndarray:
+    """
+    Scale densities to the 0-255 colour range, before truncation.
+    
+    Args:
+        densities: Interior (non-halo) density array
+        maximum: Maximum density, or 0 to draw every cell with colour 0
+        
+    Returns:
+        Floating-point array of scaled colour values
+    """
+    if maximum != 0:
+        return (densities / maximum) * 255
+    return np.zeros(densities.shape)
+
+
+def _check_finite_colours(land: np.ndarray, mice_scaled: np.ndarray, foxes_scaled: np.ndarray) -> None:
+    """
+    Reject land cells whose colour is NaN or infinite.
+    
+    Casting such values to integers would silently produce garbage, so the
+    first offending cell (in the row-major order of the reference loop, mice
+    before foxes) is converted with int(), which raises the same error as
+    the reference implementation.
+    
+    Args:
+        land: Boolean mask of land cells
+        mice_scaled: Scaled mice colours
+        foxes_scaled: Scaled foxes colours
+        
+    Raises:
+        ValueError: If a colour is NaN
+        OverflowError: If a colour is infinite
+    """
+    invalid = land & ~(np.isfinite(mice_scaled) & np.isfinite(foxes_scaled))
+    if invalid.any():
+        cell = np.unravel_index(np.argmax(invalid), invalid.shape)
+        int(mice_scaled[cell])
+        int(foxes_scaled[cell])
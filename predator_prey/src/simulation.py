@@ -11,21 +11,39 @@ Author: s2659865
 Date: April 2025
 """
 import numpy as np
-from typing import Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, Tuple
 
 from predator_prey.src.population import update_populations, calculate_statistics
 from predator_prey.src.io_handlers import initialize_averages_csv, append_averages_csv, generate_ppm
 
+# Population array types for each supported precision
+POPULATION_DTYPES = {"f64": np.float64, "f32": np.float32}
+
 
 def run_simulation(
     r: float, a: float, k: float, b: float, m: float, l: float,
     dt: float, output_steps: int, duration: int,
     width: int, height: int, mice: np.ndarray, foxes: np.ndarray,
-    landscape: np.ndarray, neighbors: np.ndarray, land_mask: np.ndarray
+    landscape: np.ndarray, neighbors: np.ndarray, land_mask: np.ndarray,
+    binary_ppm: bool = False,
+    precision: str = "f64",
+    async_io: bool = True
 ) -> None:
     """
     Run the complete predator-prey simulation with vectorized updates.
     
+    Populations are stored in double precision by default, which reproduces
+    the reference output exactly. With precision="f32" they are stored in
+    single precision, halving the memory traffic of each time step at the
+    cost of small differences in the results; the averages CSV then only
+    reports the digits that single precision can represent.
+    
+    With async_io (the default) each PPM image is written by a background
+    thread while the following time steps are computed. At most one image
+    is in flight at a time, and any error raised while writing it is
+    re-raised here. The files written are identical either way.
+    
     Args:
         r: Birth rate of mice
         a: Rate at which foxes eat mice
@@ -43,58 +61,99 @@ def run_simulation(
         landscape: The landscape array
         neighbors: Number of land neighbors for each cell
         land_mask: Boolean mask for land cells
+        binary_ppm: Write binary "P6" PPM files instead of ASCII "P3" ones
+        precision: Population precision, "f64" (default) or "f32"
+        async_io: Write PPM files in a background thread
     """
     # Create working copies of the population arrays
-    ms = mice.copy()
-    fs = foxes.copy()
-    ms_nu = ms.copy()
-    fs_nu = fs.copy()
+    dtype = POPULATION_DTYPES[precision]
+    ms = mice.astype(dtype)
+    fs = foxes.astype(dtype)
+    
+    # Buffers for the next time step. update_populations writes every
+    # interior cell before it is read, so only the halo needs zeroing.
+    ms_nu = np.empty_like(ms)
+    fs_nu = np.empty_like(fs)
+    for buffer in (ms_nu, fs_nu):
+        buffer[0, :] = buffer[-1, :] = 0
+        buffer[:, 0] = buffer[:, -1] = 0
+    
+    # Neighbor counts in the population type, so the update kernel does not
+    # convert them from integers at every cell of every step
+    neighbor_counts = neighbors.astype(dtype)
     
     # Count land cells for calculating averages
     land_count = np.count_nonzero(land_mask)
     
-    # Calculate initial averages
-    if land_count != 0:
-        mice_avg = np.sum(ms) / land_count
-        foxes_avg = np.sum(fs) / land_count
-    else:
-        mice_avg = 0
-        foxes_avg = 0
+    # Decimal places for the averages: 17 in double precision, as in the
+    # reference output, and correspondingly fewer in single precision
+    csv_digits = np.finfo(dtype).precision + 2
     
-    # Initialize the averages CSV file
-    initialize_averages_csv()
+    # Maximum population values for scaling the images. Later values come
+    # from the update kernel, which finds them while computing each step.
+    mice_max = np.max(ms)
+    foxes_max = np.max(fs)
     
     # Calculate the total number of time steps
     total_steps = int(duration / dt)
     
-    # Main simulation loop
-    for i in range(total_steps):
-        # Output data at specified intervals
-        if i % output_steps == 0:
-            # Calculate maximum population values for scaling
-            mice_max = np.max(ms)
-            foxes_max = np.max(fs)
-            
-            # Calculate average populations
-            if land_count != 0:
-                mice_avg = np.sum(ms) / land_count
-                foxes_avg = np.sum(fs) / land_count
-            else:
-                mice_avg = 0
-                foxes_avg = 0
-            
-            # Append to averages CSV
-            append_averages_csv(i, i * dt, mice_avg, foxes_avg)
+    # Background thread for writing PPM files, if enabled
+    ppm_writer = ThreadPoolExecutor(max_workers=1) if async_io else None
+    pending_ppm: Optional[Future] = None
+    
+    try:
+        # Keep the averages CSV file open for the whole run
+        with open("averages.csv", "w") as csv_file:
+            # Initialize the averages CSV file
+            initialize_averages_csv(csv_file)
             
-            # Generate PPM visualization
-            generate_ppm(i, width, height, landscape, ms, fs, mice_max, foxes_max)
-        
-        # Update populations for this time step
-        ms_nu, fs_nu = update_populations(
-            ms, fs, land_mask, neighbors,
-            r, a, k, b, m, l, dt
-        )
+            # Main simulation loop, one block of output_steps time steps at a
+            # time so output is written at the start of each block
+            for i in range(0, total_steps, output_steps):
+                # Calculate average populations
+                if land_count != 0:
+                    mice_avg = np.sum(ms) / land_count
+                    foxes_avg = np.sum(fs) / land_count
+                else:
+                    mice_avg = 0
+                    foxes_avg = 0
+                
+                # Wait for the previous image before writing this block's row,
+                # so a failed write stops the run with the same files written
+                # as when images are written in the foreground
+                if pending_ppm is not None:
+                    pending_ppm.result()
+                    pending_ppm = None
+                
+                # Append to averages CSV
+                append_averages_csv(csv_file, i, i * dt, mice_avg, foxes_avg, csv_digits)
+                
+                # Generate PPM visualization
+                if ppm_writer is None:
+                    generate_ppm(i, width, height, landscape, ms, fs, mice_max, foxes_max,
+                                 binary=binary_ppm)
+                else:
+                    # Hand the writer its own copy of the populations, since the
+                    # buffers are overwritten by the following time steps
+                    pending_ppm = ppm_writer.submit(
+                        generate_ppm, i, width, height, landscape, ms.copy(), fs.copy(),
+                        mice_max, foxes_max, binary=binary_ppm
+                    )
+                
+                # Update populations until the next output (or the end of the run)
+                for _ in range(min(output_steps, total_steps - i)):
+                    mice_max, foxes_max = update_populations(
+                        ms, fs, ms_nu, fs_nu, land_mask, neighbor_counts,
+                        r, a, k, b, m, l, dt
+                    )
+                    
+                    # Swap arrays for next iteration
+                    ms, ms_nu = ms_nu, ms
+                    fs, fs_nu = fs_nu, fs
         
-        # Swap arrays for next iteration
-        ms, ms_nu = ms_nu, ms
-        fs, fs_nu = fs_nu, fs
\ No newline at end of file
+        # Wait for the last image to be written
+        if pending_ppm is not None:
+            pending_ppm.result()
+    finally:
+        if ppm_writer is not None:
+            ppm_writer.shutdown(wait=True)
@@ -12,26 +12,50 @@ Date: April 2025
 """
 from typing import Optional, Dict, Any, Union, List, Tuple
 import os
+import stat
+from functools import lru_cache
 import numpy as np
 
+# Names of the non-negative rate parameters, in the order they are checked
+RATE_PARAMETER_NAMES = (
+    "mice birth rate (r)",
+    "mice death rate (a)",
+    "mice diffusion rate (k)",
+    "foxes birth rate (b)",
+    "foxes death rate (m)",
+    "foxes diffusion rate (l)",
+    "time step size (dt)",
+)
 
-def validate_file_exists(file_path: str) -> None:
+# Floating-point precisions supported for the population arrays
+SUPPORTED_PRECISIONS = ("f64", "f32")
+
+def validate_file_exists(file_path: str) -> os.stat_result:
     """
     Validate that a file exists and is readable.
     
     Args:
         file_path: Path to the file to check
         
+    Returns:
+        The result of the file's stat call, for callers that also need its
+        size or modification time
+        
     Raises:
         FileNotFoundError: If the file doesn't exist
+        ValueError: If the path is not a regular file
         PermissionError: If the file cannot be read
     """
-    if not os.path.exists(file_path):
+    # A single stat call answers both the existence and the file-type checks
+    try:
+        st = os.stat(file_path)
+    except (FileNotFoundError, NotADirectoryError):
         raise FileNotFoundError(f"Animal file not found: {file_path}")
-    if not os.path.isfile(file_path):
+    if not stat.S_ISREG(st.st_mode):
         raise ValueError(f"Path is not a file: {file_path}")
     if not os.access(file_path, os.R_OK):
         raise PermissionError(f"Cannot read file: {file_path}")
+    return st
 
 
 def validate_positive_float(value: float, name: str) -> None:
@@ -85,6 +109,21 @@ def validate_proportion(value: float, name: str) -> None:
         raise ValueError(f"{name} must be between 0 and 1, got {value}")
 
 
+def validate_precision(precision: str) -> None:
+    """
+    Validate the floating-point precision requested for the populations.
+    
+    Args:
+        precision: Precision name, one of SUPPORTED_PRECISIONS
+        
+    Raises:
+        ValueError: If the precision is not supported
+    """
+    if precision not in SUPPORTED_PRECISIONS:
+        raise ValueError(f"precision must be one of {', '.join(SUPPORTED_PRECISIONS)}, got {precision!r}")
+
+
+@lru_cache(maxsize=256, typed=True)
 def validate_simulation_parameters(
     r: float, a: float, k: float, b: float, m: float, l: float,
     dt: float, t: int, d: int, lseed: int, lp: float, lsm: int
@@ -92,6 +131,11 @@ def validate_simulation_parameters(
     """
     Validate all simulation parameters.
     
+    Successful validations are memoized, so parameter sweeps that call sim()
+    repeatedly with the same configuration only pay for the checks once.
+    Invalid parameters raise and are never cached. The cache is typed, so
+    e.g. t=10.0 is still rejected after t=10 has been accepted.
+    
     Args:
         r: Birth rate of mice
         a: Rate at which foxes eat mice
@@ -109,16 +153,12 @@ def validate_simulation_parameters(
     Raises:
         ValueError: If any parameters are invalid
     """
-    # Validate rates
-    validate_positive_float(r, "mice birth rate (r)")
-    validate_positive_float(a, "mice death rate (a)")
-    validate_positive_float(k, "mice diffusion rate (k)")
-    validate_positive_float(b, "foxes birth rate (b)")
-    validate_positive_float(m, "foxes death rate (m)")
-    validate_positive_float(l, "foxes diffusion rate (l)")
+    # Validate rates and time step size, checking each one's type and then
+    # its sign before moving on to the next
+    for value, name in zip((r, a, k, b, m, l, dt), RATE_PARAMETER_NAMES):
+        validate_positive_float(value, name)
     
     # Validate simulation control parameters
-    validate_positive_float(dt, "time step size (dt)")
     validate_positive_int(t, "output time step (t)")
     validate_positive_int(d, "simulation duration (d)")
     
@@ -17,4 +17,27 @@ import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import fixtures to make them available globally
-from test.utils.test_fixtures import available_refactorings, all_animal_files
\ No newline at end of file
+from test.utils.test_fixtures import (
+    available_refactorings,
+    refactored_modules,
+    refactor_name,
+    refactored_sim,
+    all_animal_files,
+    warm_animal_files,
+    shared_tmpdir
+)
+
+
+def pytest_configure(config) -> None:
+    """
+    Register custom markers used by the test suite.
+    
+    xdist_group is provided by pytest-xdist; it is registered here as well so
+    the suite runs without warnings when pytest-xdist is not installed.
+    
+    Args:
+        config: The pytest configuration object
+    """
+    config.addinivalue_line(
+        "markers", "xdist_group(name): run tests with the same group name on one pytest-xdist worker"
+    )
@@ -12,17 +12,13 @@ Date: April 2025
 
 import os
 import sys
-import importlib.util
 import pytest
-from typing import List
+from types import ModuleType
+from typing import Mapping
 
 # Add the project root to the path so imports work correctly
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-# Import from utility modules
-from test.utils.test_utilities import IMPL_DIR, PREDATOR_PREY_DIR, captured_output, temporary_directory
-from test.utils.test_fixtures import available_refactorings
-
 # ─── Interface Tests ──────────────────────────────────────────────────────────
 class TestRefactoringCore:
     """
@@ -32,73 +28,36 @@ class TestRefactoringCore:
     functionality remain consistent across all refactored implementations.
     """
     
-    def test_version_consistency(self, available_refactorings: List[str]) -> None:
+    def test_version_consistency(self, refactor_name: str, refactored_modules: Mapping[str, ModuleType]) -> None:
         """
-        Test that all implementations report the same version.
+        Test that the implementation reports the expected version.
         
         Args:
-            available_refactorings: List of available refactored implementation modules
+            refactor_name: Name of the refactored implementation module
+            refactored_modules: Loaded modules of the available implementations
         """
-        # Import the original version function
-        from predator_prey.simulate_predator_prey import getVersion as original_get_version
+        module = refactored_modules[refactor_name]
         
-        # Check original version
-        assert original_get_version() == 4.0, "Original implementation version mismatch"
-        
-        # Check each refactored implementation
-        for refactor_name in available_refactorings:
-            # Skip the main implementation since we already checked it
-            if refactor_name == "simulate_predator_prey":
-                continue
-                
-            # Import the module
-            spec = importlib.util.spec_from_file_location(
-                refactor_name, 
-                os.path.join(IMPL_DIR, f"{refactor_name}.py")
-            )
-            assert spec is not None, f"Could not create spec for {refactor_name}"
-            assert spec.loader is not None, f"Could not create loader for {refactor_name}"
-                
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
-            
-            # Test getVersion if it exists
-            assert hasattr(module, 'getVersion'), f"{refactor_name} is missing getVersion function"
-            assert module.getVersion() == 4.0, f"{refactor_name} reports incorrect version"
+        # Test getVersion if it exists
+        assert hasattr(module, 'getVersion'), f"{refactor_name} is missing getVersion function"
+        assert module.getVersion() == 4.0, f"{refactor_name} reports incorrect version"
     
-    def test_cli_existence(self, available_refactorings: List[str]) -> None:
+    def test_cli_existence(self, refactor_name: str, refactored_modules: Mapping[str, ModuleType]) -> None:
         """
-        Test that all implementations maintain the command line interface.
+        Test that the implementation maintains the command line interface.
         
         Args:
-            available_refactorings: List of available refactored implementation modules
+            refactor_name: Name of the refactored implementation module
+            refactored_modules: Loaded modules of the available implementations
         """
-        for refactor_name in available_refactorings:
-            # Handle the main implementation differently
-            if refactor_name == "simulate_predator_prey":
-                # Import the main module
-                from predator_prey.simulate_predator_prey import simCommLineIntf
-                assert callable(simCommLineIntf), "simulate_predator_prey has non-callable simCommLineIntf"
-                continue
-                
-            # Import the refactored module
-            spec = importlib.util.spec_from_file_location(
-                refactor_name, 
-                os.path.join(IMPL_DIR, f"{refactor_name}.py")
-            )
-            assert spec is not None, f"Could not create spec for {refactor_name}"
-            assert spec.loader is not None, f"Could not create loader for {refactor_name}"
-                
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
-            
-            # Test simCommLineIntf if it exists
-            assert hasattr(module, 'simCommLineIntf'), f"{refactor_name} is missing simCommLineIntf function"
-            assert callable(module.simCommLineIntf), f"{refactor_name} has non-callable simCommLineIntf"
+        module = refactored_modules[refactor_name]
+        
+        # Test simCommLineIntf if it exists
+        assert hasattr(module, 'simCommLineIntf'), f"{refactor_name} is missing simCommLineIntf function"
+        assert callable(module.simCommLineIntf), f"{refactor_name} has non-callable simCommLineIntf"
 
 
 # ─── Basic Implementation Tests ────────────────────────────────────────────────
-@pytest.mark.parametrize("refactor_name", ["simulate_predator_prey", "refactor_1", "refactor_2", "refactor_3"])
 class TestRefactoringImplementation:
     """
     Tests for individual refactored implementations.
@@ -107,60 +66,33 @@ class TestRefactoringImplementation:
     and executed without errors.
     """
     
-    def test_implementation_exists(self, refactor_name: str) -> None:
+    def test_basic_execution(self, refactor_name: str, shared_tmpdir: str) -> None:
         """
-        Test that the refactored implementation exists.
-        
-        Args:
-            refactor_name: Name of the refactored implementation module
-        """
-        if refactor_name == "simulate_predator_prey":
-            assert os.path.exists(os.path.join(PREDATOR_PREY_DIR, f"{refactor_name}.py")), "Main implementation not found"
-            return
-            
-        refactor_path = os.path.join(IMPL_DIR, f"{refactor_name}.py")
-        if not os.path.exists(refactor_path):
-            pytest.skip(f"Refactored implementation {refactor_name} not found")
-    
-    def test_implementation_loadable(self, refactor_name: str) -> None:
-        """
-        Test that the refactored implementation can be loaded.
+        Test basic execution without errors.
         
         Args:
             refactor_name: Name of the refactored implementation module
+            shared_tmpdir: Session-wide scratch directory for the output files
         """
         try:
             # Import test utility functions
-            from test.utils.test_utilities import load_refactored_implementation
+            from test.utils.test_utilities import (
+                load_refactored_implementation, null_stdout, working_directory, ANIMAL_PATHS
+            )
             
             # Try to load the refactored implementation
             refactored_sim = load_refactored_implementation(refactor_name)
-            assert callable(refactored_sim), f"{refactor_name}.sim is not callable"
         except ImportError as e:
             pytest.skip(f"Could not load {refactor_name}: {str(e)}")
-    
-    def test_basic_execution(self, refactor_name: str) -> None:
-        """
-        Test basic execution without errors.
         
-        Args:
-            refactor_name: Name of the refactored implementation module
-        """
-        try:
-            # Import test utility functions
-            from test.utils.test_utilities import load_refactored_implementation, ANIMALS_DIR
-            
-            # Try to load the refactored implementation
-            refactored_sim = load_refactored_implementation(refactor_name)
-        except ImportError:
-            pytest.skip(f"Could not load {refactor_name}")
+        assert callable(refactored_sim), f"{refactor_name}.sim is not callable"
         
         # Use a simple test case
         args = (0.1, 0.05, 0.2, 0.03, 0.09, 0.2, 0.5, 10, 50,
-                os.path.join(ANIMALS_DIR, "3x3.dat"), 
+                ANIMAL_PATHS["3x3.dat"],
                 1, 0.75, 2)
         
-        with temporary_directory():
-            with captured_output():
+        with working_directory(shared_tmpdir):
+            with null_stdout():
                 # This should not raise an exception
                 refactored_sim(*args)
\ No newline at end of file
@@ -12,22 +12,52 @@ Date: April 2025
 
 import os
 import sys
+import numpy as np
 import pytest
-from typing import Tuple
+from typing import Any, Callable, List
 
 # Add the project root to the path so imports work correctly
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 # Import from utility modules
-from test.utils.test_utilities import (
-    ANIMALS_DIR, 
-    load_refactored_implementation,
-    run_output_comparison,
-    original_sim
-)
+from test.utils.test_utilities import ANIMAL_PATHS, assert_equivalent
+
+
+# Landscape parameter values to cover
+LAND_PROPORTIONS = [0.0, 0.1, 0.25, 0.5, 0.75, 0.9, 1.0]
+SMOOTHING_PASSES = [0, 1, 3, 5, 10]
+
+
+def landscape_cases() -> List[Any]:
+    """
+    Build the (land proportion, smoothing passes) combinations to test.
+    
+    Rather than the full Cartesian product, land proportions are paired with
+    smoothing values in turn, so every value of each parameter appears at
+    least once. Every implementation runs every combination, so each
+    implementation is still tested with every land proportion and every
+    smoothing value, while the reference only runs once per combination.
+    
+    Each combination carries an xdist_group mark: with
+    ``pytest -n auto --dist=loadgroup`` all implementations tested with it
+    run on the same worker and share its cached reference run.
+    
+    Returns:
+        List of pytest parameters of (land_prop, smoothing)
+    """
+    n_cases = max(len(LAND_PROPORTIONS), len(SMOOTHING_PASSES))
+    cases = []
+    for i in range(n_cases):
+        land_prop = LAND_PROPORTIONS[i % len(LAND_PROPORTIONS)]
+        smoothing = SMOOTHING_PASSES[i % len(SMOOTHING_PASSES)]
+        cases.append(pytest.param(
+            land_prop, smoothing,
+            marks=pytest.mark.xdist_group(name=f"landscape_{land_prop}_{smoothing}")
+        ))
+    return cases
+
 
 # ─── Landscape Parameter Tests ─────────────────────────────────────────────────
-@pytest.mark.parametrize("refactor_name", ["simulate_predator_prey", "refactor_1", "refactor_2", "refactor_3"])
 class TestLandscapeVariations:
     """
     Tests for different landscape parameters.
@@ -36,66 +66,66 @@ class TestLandscapeVariations:
     and smoothing passes identically to the original implementation.
     """
     
-    @pytest.mark.parametrize("land_prop", [0.0, 0.1, 0.25, 0.5, 0.75, 0.9, 1.0])
-    def test_land_proportions(self, refactor_name: str, land_prop: float) -> None:
+    @pytest.mark.parametrize("land_prop,smoothing", landscape_cases())
+    def test_landscape_parameters(
+        self, refactor_name: str, refactored_sim: Callable, land_prop: float, smoothing: int
+    ) -> None:
         """
-        Test a range of land proportions.
+        Test a combination of land proportion and smoothing passes.
         
         Args:
             refactor_name: Name of the refactored implementation module
+            refactored_sim: The implementation's sim function
             land_prop: Land proportion value to test
+            smoothing: Number of landscape smoothing passes to test
         """
-        if refactor_name.startswith("refactor_"):
-            refactor_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 
-                                        "performance_experiment", "implementations", f"{refactor_name}.py")
-            if not os.path.exists(refactor_path):
-                pytest.skip(f"Refactored implementation {refactor_name} not found at {refactor_path}")
-            
-        try:
-            refactored_sim = load_refactored_implementation(refactor_name)
-        except ImportError as e:
-            pytest.skip(f"Could not load {refactor_name}: {str(e)}")
-        
-        # Create args with the specified land proportion
+        # Create args with the specified landscape parameters
         args = (0.1, 0.05, 0.2, 0.03, 0.09, 0.2, 0.5, 10, 30,
-               os.path.join(ANIMALS_DIR, "3x3.dat"),
-               1, land_prop, 2)
+               ANIMAL_PATHS["3x3.dat"],
+               1, land_prop, smoothing)
         
-        # Run comparison
-        results = run_output_comparison(original_sim, refactored_sim, args)
-        
-        # Check results
-        assert results["all_match"], (
-            f"{refactor_name} produces different output with land proportion {land_prop}")
+        assert_equivalent(refactor_name, refactored_sim, args,
+                          f"land proportion {land_prop} and {smoothing} smoothing passes")
+
+
+# ─── Synchronous Smoothing Tests ───────────────────────────────────────────────
+class TestSynchronousSmoothing:
+    """
+    Tests for the opt-in synchronous smoothing passes.
+    
+    Synchronous smoothing is not expected to match the original landscapes,
+    so these tests check it against passes computed by hand instead.
+    """
     
-    @pytest.mark.parametrize("smoothing", [0, 1, 3, 5, 10])
-    def test_smoothing_passes(self, refactor_name: str, smoothing: int) -> None:
+    def test_against_hand_computed_passes(self) -> None:
         """
-        Test a range of smoothing pass values.
+        Test one and two synchronous passes over a checkerboard.
         
-        Args:
-            refactor_name: Name of the refactored implementation module
-            smoothing: Number of landscape smoothing passes to test
+        Every cell of the checkerboard flips on the first pass, because each
+        sum is taken from the unsmoothed landscape, so only the centre cell
+        survives the second pass.
         """
-        if refactor_name.startswith("refactor_"):
-            refactor_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 
-                                        "performance_experiment", "implementations", f"{refactor_name}.py")
-            if not os.path.exists(refactor_path):
-                pytest.skip(f"Refactored implementation {refactor_name} not found at {refactor_path}")
-            
-        try:
-            refactored_sim = load_refactored_implementation(refactor_name)
-        except ImportError as e:
-            pytest.skip(f"Could not load {refactor_name}: {str(e)}")
+        from predator_prey.src.landscape import smooth_landscape
         
-        # Create args with the specified smoothing passes
-        args = (0.1, 0.05, 0.2, 0.03, 0.09, 0.2, 0.5, 10, 30,
-               os.path.join(ANIMALS_DIR, "3x3.dat"),
-               1, 0.75, smoothing)
+        landscape = np.zeros((5, 5), dtype=np.int8)
+        landscape[1:4, 1:4] = [[1, 0, 1],
+                               [0, 1, 0],
+                               [1, 0, 1]]
+        
+        one_pass = smooth_landscape(landscape, 1, synchronous=True)
+        two_passes = smooth_landscape(landscape, 2, synchronous=True)
+        
+        np.testing.assert_array_equal(one_pass[1:4, 1:4], [[0, 1, 0],
+                                                           [1, 0, 1],
+                                                           [0, 1, 0]])
+        np.testing.assert_array_equal(two_passes[1:4, 1:4], [[0, 0, 0],
+                                                             [0, 1, 0],
+                                                             [0, 0, 0]])
         
-        # Run comparison
-        results = run_output_comparison(original_sim, refactored_sim, args)
+        # The halo stays water and the input is left unchanged
+        for smoothed in (one_pass, two_passes):
+            assert not smoothed[[0, -1], :].any() and not smoothed[:, [0, -1]].any()
+        assert landscape[1:4, 1:4].tolist() == [[1, 0, 1], [0, 1, 0], [1, 0, 1]]
         
-        # Check results
-        assert results["all_match"], (
-            f"{refactor_name} produces different output with {smoothing} smoothing passes")
\ No newline at end of file
+        # The sequential reference pass gives a different landscape here
+        assert not np.array_equal(smooth_landscape(landscape, 1), one_pass)
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+test_output_files.py
+
+Tests for the optional output modes of the main predator-prey simulation.
+These tests verify that the alternative output modes encode the same results
+as the default outputs checked against the original implementation.
+
+Author: s2659865
+Date: April 2025
+"""
+
+import os
+import sys
+import numpy as np
+import pytest
+
+# Add the project root to the path so imports work correctly
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+# Import from utility modules
+from test.utils.test_utilities import (
+    ANIMAL_PATHS,
+    temporary_directory,
+    null_stdout,
+    output_file_digests
+)
+
+
+def read_ppm(file_path: str) -> np.ndarray:
+    """
+    Read an ASCII (P3) or binary (P6) PPM file into an RGB array.
+
+    Args:
+        file_path: Path to the PPM file
+
+    Returns:
+        Array of shape (height, width, 3) holding the pixel values
+    """
+    with open(file_path, "rb") as f:
+        magic = f.readline().strip()
+        width, height = [int(i) for i in f.readline().split()]
+        f.readline()  # Maximum colour value
+        data = f.read()
+
+    if magic == b"P6":
+        pixels = np.frombuffer(data, dtype=np.uint8)
+    else:
+        pixels = np.array(data.split(), dtype=np.uint8)
+    return pixels.reshape(height, width, 3)
+
+
+# ─── Binary PPM Tests ──────────────────────────────────────────────────────────
+class TestBinaryPPM:
+    """
+    Tests for binary (P6) PPM output.
+
+    These tests verify that binary PPM files contain the same pixels as the
+    default ASCII PPM files, and that the CSV output is unaffected.
+    """
+
+    @pytest.mark.parametrize("animal_file", ["3x3.dat", "40x20ps.dat", "islands.dat"])
+    def test_binary_matches_ascii(self, animal_file: str) -> None:
+        """
+        Test that P6 output encodes the same image as P3 output.
+
+        Args:
+            animal_file: Name of the animal density file to simulate
+        """
+        # Imported here so collecting this module does not import the simulator
+        from test.utils.test_utilities import main_sim
+
+        args = (0.1, 0.05, 0.2, 0.03, 0.09, 0.2, 0.5, 10, 30,
+                ANIMAL_PATHS[animal_file],
+                1, 0.75, 2)
+
+        with temporary_directory() as ascii_dir:
+            with null_stdout():
+                main_sim(*args)
+
+            with temporary_directory() as binary_dir:
+                with null_stdout():
+                    main_sim(*args, binary_ppm=True)
+
+                ppm_files = sorted(f for f in os.listdir(ascii_dir) if f.endswith(".ppm"))
+                assert ppm_files, f"No PPM files written for {animal_file}"
+                assert ppm_files == sorted(f for f in os.listdir(binary_dir) if f.endswith(".ppm"))
+
+                for ppm_file in ppm_files:
+                    with open(os.path.join(binary_dir, ppm_file), "rb") as f:
+                        assert f.readline() == b"P6\n", f"{ppm_file} is not a binary PPM"
+
+                    np.testing.assert_array_equal(
+                        read_ppm(os.path.join(ascii_dir, ppm_file)),
+                        read_ppm(os.path.join(binary_dir, ppm_file)),
+                        err_msg=f"Binary PPM differs from ASCII PPM for {ppm_file}"
+                    )
+
+                with open(os.path.join(ascii_dir, "averages.csv"), "rb") as f1, \
+                     open(os.path.join(binary_dir, "averages.csv"), "rb") as f2:
+                    assert f1.read() == f2.read(), "Binary PPM output changed the CSV output"
+
+
+# ─── Precision Tests ───────────────────────────────────────────────────────────
+class TestPrecision:
+    """
+    Tests for single-precision population arrays.
+
+    Single precision is not bit-identical to the reference, so these tests
+    compare against the default double-precision run within a tolerance.
+    """
+
+    @pytest.mark.parametrize("animal_file", ["3x3.dat", "40x20ps.dat", "islands.dat"])
+    def test_f32_close_to_f64(self, animal_file: str) -> None:
+        """
+        Test that an f32 run writes the same files with close averages.
+
+        Args:
+            animal_file: Name of the animal density file to simulate
+        """
+        # Imported here so collecting this module does not import the simulator
+        from test.utils.test_utilities import main_sim
+
+        args = (0.1, 0.05, 0.2, 0.03, 0.09, 0.2, 0.5, 10, 30,
+                ANIMAL_PATHS[animal_file],
+                1, 0.75, 2)
+
+        with temporary_directory() as f64_dir:
+            with null_stdout():
+                main_sim(*args)
+
+            with temporary_directory() as f32_dir:
+                with null_stdout():
+                    main_sim(*args, precision="f32")
+
+                assert sorted(os.listdir(f64_dir)) == sorted(os.listdir(f32_dir))
+
+                f64_rows = np.loadtxt(os.path.join(f64_dir, "averages.csv"), delimiter=",", skiprows=1, ndmin=2)
+                f32_rows = np.loadtxt(os.path.join(f32_dir, "averages.csv"), delimiter=",", skiprows=1, ndmin=2)
+                assert f64_rows.shape == f32_rows.shape
+                np.testing.assert_array_equal(f64_rows[:, :2], f32_rows[:, :2])
+                np.testing.assert_allclose(f32_rows[:, 2:], f64_rows[:, 2:], rtol=1e-5, atol=1e-6)
+
+    def test_invalid_precision(self, capsys: pytest.CaptureFixture) -> None:
+        """
+        Test that an unsupported precision is reported without running.
+
+        Args:
+            capsys: pytest fixture capturing the simulation's stdout
+        """
+        # Imported here so collecting this module does not import the simulator
+        from test.utils.test_utilities import main_sim
+
+        with temporary_directory() as tmp_dir:
+            main_sim(0.1, 0.05, 0.2, 0.03, 0.09, 0.2, 0.5, 10, 30,
+                     ANIMAL_PATHS["3x3.dat"], 1, 0.75, 2,
+                     precision="f16")
+
+            assert "precision must be one of" in capsys.readouterr().out
+            assert not os.listdir(tmp_dir)
+
+
+# ─── Failed Run Tests ──────────────────────────────────────────────────────────
+class TestFailedRuns:
+    """
+    Tests for runs whose populations overflow.
+
+    These tests verify that invalid densities are reported with the same
+    error as the reference loop and never leave a partial image behind.
+    """
+
+    @pytest.mark.parametrize("binary", [False, True], ids=["ascii", "binary"])
+    def test_nan_densities_leave_no_image(self, binary: bool) -> None:
+        """
+        Test that NaN densities raise before the image file is opened.
+
+        Args:
+            binary: Whether to write a binary PPM
+        """
+        from predator_prey.src.io_handlers import generate_ppm
+
+        landscape = np.ones((5, 5), dtype=np.int32)
+        mice = np.ones((5, 5))
+        mice[2, 2] = np.nan
+        foxes = np.ones((5, 5))
+
+        with temporary_directory() as tmp_dir:
+            with pytest.raises(ValueError, match="cannot convert float NaN to integer"):
+                generate_ppm(0, 3, 3, landscape, mice, foxes, 1.0, 1.0, binary=binary)
+
+            assert not os.listdir(tmp_dir)
+
+    def test_overflow_matches_original(self) -> None:
+        """
+        Test that a run failing part-way leaves the same files as the original.
+        """
+        # Imported here so collecting this module does not import the simulators
+        from test.utils.test_utilities import main_sim, original_sim
+
+        args = (1e308, 0.05, 0.2, 0.03, 0.09, 0.2, 0.5, 10, 30,
+                ANIMAL_PATHS["3x3.dat"], 1, 0.75, 2)
+
+        with np.errstate(all="ignore"):
+            with temporary_directory() as original_dir:
+                with null_stdout(), pytest.raises(ValueError, match="cannot convert float NaN to integer"):
+                    original_sim(*args)
+
+                with temporary_directory() as main_dir:
+                    with null_stdout():
+                        main_sim(*args)
+
+                    assert output_file_digests(main_dir) == output_file_digests(original_dir)
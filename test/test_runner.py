@@ -12,6 +12,7 @@ Date: April 2025
 
 import os
 import sys
+import importlib.util
 import pytest
 from typing import List
 
@@ -22,9 +23,18 @@ def run_tests() -> int:
     """
     Run all predator-prey refactoring tests.
     
+    Passing --debug disables output capture and shows local variables in
+    tracebacks; both are off by default because they slow down the run.
+    
     Returns:
         Exit code from pytest (0 for success, non-zero for failure)
     """
+    # Separate the runner's own option from the arguments for pytest
+    extra_args = sys.argv[1:]
+    debug = "--debug" in extra_args
+    if debug:
+        extra_args = [arg for arg in extra_args if arg != "--debug"]
+    
     # Define arguments for pytest
     pytest_args: List[str] = [
         # Discover tests in the current directory
@@ -36,18 +46,27 @@ def run_tests() -> int:
         # Generate reports
         "--junitxml=test-results.xml",
         
-        # Output to console
-        "-s",
-        
-        # Show local variables in tracebacks
-        "--showlocals",
+        # Do not write a .pytest_cache directory
+        "-p", "no:cacheprovider",
         
         # Color output
         "--color=yes"
     ]
     
+    if debug:
+        # Output to console and show local variables in tracebacks
+        pytest_args.extend(["-s", "--showlocals"])
+    
+    # Run tests in parallel when pytest-xdist is installed, keeping each
+    # xdist_group on one worker so grouped tests share cached reference runs.
+    # Every worker is a separate process with its own working directory, so
+    # the chdir in temporary_directory does not race between workers.
+    if importlib.util.find_spec("xdist") is not None:
+        workers = os.environ.get("PYTEST_WORKERS", "auto")
+        pytest_args.extend(["-n", workers, "--dist=loadgroup"])
+    
     # Add any arguments from command line
-    pytest_args.extend(sys.argv[1:])
+    pytest_args.extend(extra_args)
     
     # Run pytest with these arguments
     return pytest.main(pytest_args)
@@ -11,101 +11,238 @@ Date: April 2025
 """
 
 import os
+import importlib
 import pytest
-from typing import List
+from types import MappingProxyType, ModuleType
+from typing import Callable, Mapping, NamedTuple, Tuple
 
 # Import path constants from utilities
-from test.utils.test_utilities import ANIMALS_DIR, IMPL_DIR
+from test.utils.test_utilities import (
+    ANIMALS_DIR,
+    AVAILABLE_IMPLEMENTATIONS,
+    IMPLEMENTATION_NAMES,
+    MISSING_IMPLEMENTATIONS,
+    load_refactored_implementation,
+    load_refactored_module
+)
+
+# Animal files larger than this (~1000KB) are left out to keep test duration reasonable
+MAX_ANIMAL_FILE_SIZE = 10000 * 100
+
+# Implementations under test, with a pre-marked skip for every missing
+# refactor so it is reported once per test case
+REFACTOR_NAMES = [
+    pytest.param(name, marks=pytest.mark.skip(reason=f"Refactored implementation {name} not found"))
+    if name in MISSING_IMPLEMENTATIONS else name
+    for name in IMPLEMENTATION_NAMES
+]
+
+@pytest.fixture(scope="session")
+def available_refactorings() -> Tuple[str, ...]:
+    """
+    Return the available refactored implementation module names.
+    
+    These are the main implementation followed by the refactor_1.py,
+    refactor_2.py, etc. files found in the performance_experiment/implementations
+    directory when test_utilities was imported. A tuple is returned so tests
+    cannot modify the shared value.
+    
+    Returns:
+        Tuple of refactored implementation module names without .py extension
+    """
+    return AVAILABLE_IMPLEMENTATIONS
+
+
+@pytest.fixture(scope="session")
+def refactored_modules(available_refactorings: Tuple[str, ...]) -> Mapping[str, ModuleType]:
+    """
+    Return the modules of all available implementations.
+    
+    Each module is loaded once per session, so tests checking module-level
+    interfaces share the same module objects.
+    
+    Args:
+        available_refactorings: Names of the available implementation modules
+    
+    Returns:
+        Read-only mapping of implementation names to their loaded modules
+    """
+    modules = {}
+    for name in available_refactorings:
+        if name == "simulate_predator_prey":
+            modules[name] = importlib.import_module("predator_prey.simulate_predator_prey")
+        else:
+            modules[name] = load_refactored_module(name)
+    return MappingProxyType(modules)
+
 
-@pytest.fixture
-def available_refactorings() -> List[str]:
+@pytest.fixture(scope="session", params=REFACTOR_NAMES)
+def refactor_name(request: pytest.FixtureRequest) -> str:
     """
-    Return a list of available refactored implementation module names.
+    Return the name of an implementation under test.
     
-    This fixture looks for refactor_1.py, refactor_2.py, etc. files
-    in the performance_experiment/implementations directory and also includes the main implementation.
+    Tests using this fixture run once for every name in REFACTOR_NAMES.
     
     Returns:
-        List of refactored implementation module names without .py extension
+        Name of the implementation module without .py extension
     """
-    refactorings = ["simulate_predator_prey"]  # Always include the main implementation
+    return request.param
+
+
+@pytest.fixture(scope="session")
+def refactored_sim(refactor_name: str) -> Callable:
+    """
+    Return the sim function of the implementation under test.
+    
+    The implementation is loaded once per session rather than in every
+    test, and an implementation that fails to load skips its tests here.
     
-    for i in range(1, 4):  # Check refactor_1, refactor_2, refactor_3
-        refactor_path = os.path.join(IMPL_DIR, f"refactor_{i}.py")
-        if os.path.exists(refactor_path):
-            refactorings.append(f"refactor_{i}")
-    return refactorings
+    Args:
+        refactor_name: Name of the implementation module
+    
+    Returns:
+        The implementation's sim function
+    """
+    try:
+        return load_refactored_implementation(refactor_name)
+    except ImportError as e:
+        pytest.skip(f"Could not load {refactor_name}: {str(e)}")
 
 
-@pytest.fixture
-def all_animal_files() -> List[str]:
+@pytest.fixture(scope="session")
+def all_animal_files() -> Tuple[Tuple[str, int], ...]:
     """
-    Return a list of all animal density files in the animals directory.
+    Return all animal density files in the animals directory.
     
     These files contain the initial distribution of predators and prey.
+    The directory is scanned once per test session with os.scandir, which
+    also provides each file's size without a separate stat call per test.
+    Files larger than MAX_ANIMAL_FILE_SIZE are excluded, and the rest are
+    ordered smallest first so failures on small inputs show up early.
+    
+    Returns:
+        Tuple of (absolute path, size in bytes) pairs for the .dat files in
+        the animals directory, sorted by size
+    """
+    with os.scandir(ANIMALS_DIR) as entries:
+        files = [
+            (entry.path, entry.stat().st_size)
+            for entry in entries
+            if entry.name.endswith(".dat")
+        ]
+    return tuple(sorted(
+        (file for file in files if file[1] <= MAX_ANIMAL_FILE_SIZE),
+        key=lambda file: (file[1], file[0])
+    ))
+
+
+@pytest.fixture(scope="session", autouse=True)
+def warm_animal_files(all_animal_files: Tuple[Tuple[str, int], ...]) -> None:
+    """
+    Read every animal file once at the start of the session.
+    
+    The simulators are tested as they are, reading their input from disk,
+    so rather than feeding them cached data this primes the OS page cache:
+    the repeated reads by the original and refactored implementations are
+    then served from memory.
+    
+    Args:
+        all_animal_files: (path, size) pairs of the animal files under test
+    """
+    for path, _ in all_animal_files:
+        with open(path, "rb") as f:
+            f.read()
+
+
+@pytest.fixture(scope="session")
+def shared_tmpdir(tmp_path_factory: pytest.TempPathFactory) -> str:
+    """
+    Return a scratch directory shared by all tests in the session.
+    
+    It is meant for tests that only check that a run completes, so output
+    files from different tests may overwrite each other. pytest cleans up
+    the directory, so no per-test removal is needed.
     
     Returns:
-        List of absolute paths to all .dat files in the animals directory
+        Path to the shared scratch directory
     """
-    files = []
-    for filename in os.listdir(ANIMALS_DIR):
-        if filename.endswith(".dat"):
-            files.append(os.path.join(ANIMALS_DIR, filename))
-    return files
+    return str(tmp_path_factory.mktemp("sim_outputs"))
 
 
 # Definition of standard test parameter sets for reuse across test modules
-# Each tuple contains a name and the actual parameters for the simulation
+# Each entry contains a name and the actual parameters for the simulation
+class SimParams(NamedTuple):
+    """
+    A named set of simulation parameters.
+    
+    Fields follow the argument order of sim(), preceded by the case name, so
+    entries can still be unpacked positionally like plain tuples.
+    """
+    name: str
+    r: float
+    a: float
+    k: float
+    b: float
+    m: float
+    l: float
+    dt: float
+    t: int
+    d: int
+    animal_file: str
+    lseed: int
+    lp: float
+    lsm: int
+
 
 # Basic parameter variations for testing
-basic_parameters = [
-    ("small_basic", 0.1, 0.05, 0.2, 0.03, 0.09, 0.2, 0.5, 10, 50, "3x3.dat", 1, 0.75, 2),
-    ("medium_grid", 0.1, 0.05, 0.2, 0.03, 0.09, 0.2, 0.5, 10, 50, "performance_experiment_40x40.dat", 1, 0.75, 2),
-    ("large_grid", 0.1, 0.05, 0.2, 0.03, 0.09, 0.2, 0.5, 10, 50, "performance_experiment_80x80.dat", 1, 0.75, 2),
-]
+basic_parameters = (
+    SimParams("small_basic", 0.1, 0.05, 0.2, 0.03, 0.09, 0.2, 0.5, 10, 50, "3x3.dat", 1, 0.75, 2),
+    SimParams("medium_grid", 0.1, 0.05, 0.2, 0.03, 0.09, 0.2, 0.5, 10, 50, "performance_experiment_40x40.dat", 1, 0.75, 2),
+    SimParams("large_grid", 0.1, 0.05, 0.2, 0.03, 0.09, 0.2, 0.5, 10, 50, "performance_experiment_80x80.dat", 1, 0.75, 2),
+)
 
 # Parameter variations focused on birth rates
-birth_parameters = [
-    ("high_birth", 0.2, 0.05, 0.2, 0.1, 0.09, 0.2, 0.5, 10, 50, "3x3.dat", 1, 0.75, 2),
-    ("zero_birth", 0.0, 0.05, 0.2, 0.0, 0.09, 0.2, 0.5, 10, 50, "3x3.dat", 1, 0.75, 2),
-]
+birth_parameters = (
+    SimParams("high_birth", 0.2, 0.05, 0.2, 0.1, 0.09, 0.2, 0.5, 10, 50, "3x3.dat", 1, 0.75, 2),
+    SimParams("zero_birth", 0.0, 0.05, 0.2, 0.0, 0.09, 0.2, 0.5, 10, 50, "3x3.dat", 1, 0.75, 2),
+)
 
 # Parameter variations focused on predation and diffusion
-movement_parameters = [
-    ("high_predation", 0.1, 0.2, 0.2, 0.03, 0.09, 0.2, 0.5, 10, 50, "3x3.dat", 1, 0.75, 2),
-    ("high_diffusion", 0.1, 0.05, 0.5, 0.03, 0.09, 0.5, 0.5, 10, 50, "3x3.dat", 1, 0.75, 2),
-    ("zero_diffusion", 0.1, 0.05, 0.0, 0.03, 0.09, 0.0, 0.5, 10, 50, "3x3.dat", 1, 0.75, 2),
-]
+movement_parameters = (
+    SimParams("high_predation", 0.1, 0.2, 0.2, 0.03, 0.09, 0.2, 0.5, 10, 50, "3x3.dat", 1, 0.75, 2),
+    SimParams("high_diffusion", 0.1, 0.05, 0.5, 0.03, 0.09, 0.5, 0.5, 10, 50, "3x3.dat", 1, 0.75, 2),
+    SimParams("zero_diffusion", 0.1, 0.05, 0.0, 0.03, 0.09, 0.0, 0.5, 10, 50, "3x3.dat", 1, 0.75, 2),
+)
 
 # Parameter variations focused on timesteps
-timestep_parameters = [
-    ("small_timestep", 0.1, 0.05, 0.2, 0.03, 0.09, 0.2, 0.1, 10, 50, "3x3.dat", 1, 0.75, 2),
-    ("large_timestep", 0.1, 0.05, 0.2, 0.03, 0.09, 0.2, 1.0, 10, 50, "3x3.dat", 1, 0.75, 2),
-    ("frequent_output", 0.1, 0.05, 0.2, 0.03, 0.09, 0.2, 0.5, 5, 50, "3x3.dat", 1, 0.75, 2),
-]
+timestep_parameters = (
+    SimParams("small_timestep", 0.1, 0.05, 0.2, 0.03, 0.09, 0.2, 0.1, 10, 50, "3x3.dat", 1, 0.75, 2),
+    SimParams("large_timestep", 0.1, 0.05, 0.2, 0.03, 0.09, 0.2, 1.0, 10, 50, "3x3.dat", 1, 0.75, 2),
+    SimParams("frequent_output", 0.1, 0.05, 0.2, 0.03, 0.09, 0.2, 0.5, 5, 50, "3x3.dat", 1, 0.75, 2),
+)
 
 # Parameter variations focused on grid configuration
-grid_parameters = [
-    ("single_cell", 0.1, 0.05, 0.2, 0.03, 0.09, 0.2, 0.5, 10, 50, "1x1.dat", 1, 0.75, 2),
-    ("only_mice", 0.1, 0.05, 0.2, 0.03, 0.09, 0.2, 0.5, 10, 50, "1x1prey.dat", 1, 0.75, 2),
-    ("only_foxes", 0.1, 0.05, 0.2, 0.03, 0.09, 0.2, 0.5, 10, 50, "1x1pred.dat", 1, 0.75, 2),
-    ("logo_pattern", 0.1, 0.05, 0.2, 0.03, 0.09, 0.2, 0.5, 10, 50, "40x20ps.dat", 1, 0.75, 2),
-]
+grid_parameters = (
+    SimParams("single_cell", 0.1, 0.05, 0.2, 0.03, 0.09, 0.2, 0.5, 10, 50, "1x1.dat", 1, 0.75, 2),
+    SimParams("only_mice", 0.1, 0.05, 0.2, 0.03, 0.09, 0.2, 0.5, 10, 50, "1x1prey.dat", 1, 0.75, 2),
+    SimParams("only_foxes", 0.1, 0.05, 0.2, 0.03, 0.09, 0.2, 0.5, 10, 50, "1x1pred.dat", 1, 0.75, 2),
+    SimParams("logo_pattern", 0.1, 0.05, 0.2, 0.03, 0.09, 0.2, 0.5, 10, 50, "40x20ps.dat", 1, 0.75, 2),
+)
 
 # Parameter variations for extreme cases
-extreme_parameters = [
-    ("explosive_growth", 0.5, 0.01, 0.2, 0.5, 0.01, 0.2, 0.5, 10, 30, "3x3.dat", 1, 0.75, 2),
-    ("population_crash", 0.01, 0.5, 0.2, 0.01, 0.5, 0.2, 0.5, 10, 30, "3x3.dat", 1, 0.75, 2),
-    ("rapid_diffusion", 0.1, 0.05, 0.9, 0.03, 0.09, 0.9, 0.5, 10, 30, "3x3.dat", 1, 0.75, 2),
-    ("tiny_timestep", 0.1, 0.05, 0.2, 0.03, 0.09, 0.2, 0.01, 10, 30, "3x3.dat", 1, 0.75, 2),
-    ("sparse_landscape", 0.1, 0.05, 0.2, 0.03, 0.09, 0.2, 0.5, 10, 30, "performance_experiment_20x20.dat", 1, 0.1, 2)
-]
+extreme_parameters = (
+    SimParams("explosive_growth", 0.5, 0.01, 0.2, 0.5, 0.01, 0.2, 0.5, 10, 30, "3x3.dat", 1, 0.75, 2),
+    SimParams("population_crash", 0.01, 0.5, 0.2, 0.01, 0.5, 0.2, 0.5, 10, 30, "3x3.dat", 1, 0.75, 2),
+    SimParams("rapid_diffusion", 0.1, 0.05, 0.9, 0.03, 0.09, 0.9, 0.5, 10, 30, "3x3.dat", 1, 0.75, 2),
+    SimParams("tiny_timestep", 0.1, 0.05, 0.2, 0.03, 0.09, 0.2, 0.01, 10, 30, "3x3.dat", 1, 0.75, 2),
+    SimParams("sparse_landscape", 0.1, 0.05, 0.2, 0.03, 0.09, 0.2, 0.5, 10, 30, "performance_experiment_20x20.dat", 1, 0.1, 2),
+)
 
 # Combined parameter list for comprehensive testing
 all_parameter_variations = (
-    basic_parameters + 
-    birth_parameters + 
-    movement_parameters + 
-    timestep_parameters + 
-    grid_parameters
+    *basic_parameters,
+    *birth_parameters,
+    *movement_parameters,
+    *timestep_parameters,
+    *grid_parameters,
 )
\ No newline at end of file